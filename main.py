@@ -1,8 +1,18 @@
+import hashlib
+import json
+import mmap
 import os
+import random
 import re
 import smtplib
+import sqlite3
 import ssl
+import tempfile
+import threading
 import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from email.message import EmailMessage
 
@@ -11,6 +21,7 @@ import feedparser
 from bs4 import BeautifulSoup, NavigableString, Tag
 from dateutil import tz
 from weasyprint import HTML
+from weasyprint.text.fonts import FontConfiguration
 
 
 # ======================
@@ -39,11 +50,32 @@ DEBUG_DUMP_HTML = os.getenv("DEBUG_DUMP_HTML", "0") == "1"
 # ✅ 0이면 당일, -1이면 전날, -2면 이틀 전...
 ISSUE_OFFSET_DAYS = int(os.getenv("ISSUE_OFFSET_DAYS", "0"))
 
+# 번역 결과를 실행 간에 재사용하는 sqlite 캐시 파일 (빈 값이면 디스크 캐시 끔)
+DEEPL_CACHE_PATH = os.getenv("DEEPL_CACHE_PATH", "deepl_cache.sqlite")
+DEEPL_TARGET_LANG = "KO"
+
+# 1이면 실행 전/후 DeepL 사용량 조회(HTTP 2회)를 생략 (디버그/드라이런용)
+SKIP_DEEPL_USAGE = os.getenv("SKIP_DEEPL_USAGE", "0") == "1"
+
+# DeepL 동시 요청 수(네트워크 대기 위주라 스레드로 충분). Free 플랜은 동시 요청이 많으면 429 → 기본 5
+DEEPL_MAX_WORKERS = max(1, int(os.getenv("DEEPL_MAX_WORKERS", "5")))
+
+# RSS 원문 + ETag/Last-Modified를 저장해 두고 조건부 요청(변경 없으면 304 → 저장본 사용)
+RSS_CACHE_PATH = os.getenv("RSS_CACHE_PATH", "rss_cache.xml")
+
+# BeautifulSoup 파서 (C 기반 lxml; 비교/디버그 때 "html.parser"로 바꿔볼 수 있게 한 곳에서 관리)
+HTML_PARSER = "lxml"
+
 KST = tz.gettz("Asia/Seoul")
 
 translator = None
 if DEEPL_API_KEY:
-    translator = deepl.Translator(DEEPL_API_KEY, server_url=DEEPL_SERVER_URL)
+    # 번역기는 모듈에 하나만 두고 공유 → 내부 requests.Session(keep-alive)을 모든 요청이 재사용
+    translator = deepl.Translator(
+        DEEPL_API_KEY,
+        server_url=DEEPL_SERVER_URL,
+        send_platform_info=False,
+    )
 
 
 # ======================
@@ -54,7 +86,7 @@ def now_kst():
 
 
 def safe_print_deepl_usage(prefix="DeepL usage"):
-    if not translator:
+    if not translator or SKIP_DEEPL_USAGE:
         return
     try:
         usage = translator.get_usage()
@@ -66,96 +98,245 @@ def safe_print_deepl_usage(prefix="DeepL usage"):
 # ======================
 # 번역 보호(placeholder)
 # ======================
+# 보호 단어 -> placeholder는 모듈 로드 시 한 번만 계산, 치환은 정규식 한 번으로
+_PROTECT_PLACEHOLDERS = {
+    term: f"__PROTECT_{re.sub(r'[^A-Za-z0-9]', '', term).upper()}__" for term in PROTECT_TERMS
+}
+_PROTECT_RE = re.compile(
+    "|".join(re.escape(t) for t in sorted(PROTECT_TERMS, key=len, reverse=True))
+)
+# 복원도 placeholder 전체를 정규식 한 번으로 (보호 단어 수만큼 replace 반복 X)
+_RESTORE_RE = re.compile("|".join(re.escape(p) for p in _PROTECT_PLACEHOLDERS.values()))
+
+
 def protect_terms(text: str):
-    if not text:
+    if not text or not PROTECT_TERMS:
         return text, {}
 
     mapping = {}
-    out = text
 
-    for term in PROTECT_TERMS:
-        placeholder = f"__PROTECT_{re.sub(r'[^A-Za-z0-9]', '', term).upper()}__"
-        if term in out:
-            out = out.replace(term, placeholder)
-            mapping[placeholder] = term
+    def _sub(m):
+        placeholder = _PROTECT_PLACEHOLDERS[m.group(0)]
+        mapping[placeholder] = m.group(0)
+        return placeholder
 
+    out = _PROTECT_RE.sub(_sub, text)
     return out, mapping
 
 
 def restore_terms(text: str, mapping: dict):
     if not text or not mapping:
         return text
-    out = text
-    for ph, term in mapping.items():
-        out = out.replace(ph, term)
-    return out
+    return _RESTORE_RE.sub(lambda m: mapping.get(m.group(0), m.group(0)), text)
 
 
 # ======================
 # DeepL 번역 (긴 텍스트 안정 처리)
 # ======================
-def _split_by_paragraph(text: str, max_chars: int = 4500):
-    text = (text or "").strip()
-    if not text:
-        return []
-
-    paras = [p.strip() for p in re.split(r"\n{2,}", text) if p.strip()]
-    chunks, buf = [], ""
-
-    for p in paras:
-        add = p + "\n\n"
-        if len(buf) + len(add) <= max_chars:
-            buf += add
-        else:
-            if buf.strip():
-                chunks.append(buf.strip())
-
-            if len(add) > max_chars:
-                for i in range(0, len(add), max_chars):
-                    part = add[i : i + max_chars].strip()
-                    if part:
-                        chunks.append(part)
-                buf = ""
-            else:
-                buf = add
+# 같은 문장(Read more, 섹션 제목 등)은 한 번만 번역: 원문 해시 -> 번역문
+# 1차: 프로세스 메모리 dict, 2차: DEEPL_CACHE_PATH sqlite (GitHub Actions cache로 실행 간 유지)
+_TRANSLATION_CACHE: dict[str, str] = {}
+_cache_conn = None
+# 열기에 한 번 실패하면 이번 실행에서는 디스크 캐시를 다시 시도하지 않음
+_cache_disabled = False
 
-    if buf.strip():
-        chunks.append(buf.strip())
 
-    return chunks
+def _cache_key(text: str) -> str:
+    return hashlib.sha1(f"{DEEPL_TARGET_LANG}\0{text}".encode("utf-8")).hexdigest()
 
 
-def translate_text(text: str, retries: int = 3) -> str:
-    if not text or not text.strip():
-        return text
+def _cache_db():
+    global _cache_conn, _cache_disabled
+    if _cache_conn is None and DEEPL_CACHE_PATH and not _cache_disabled:
+        conn = None
+        try:
+            conn = sqlite3.connect(DEEPL_CACHE_PATH)
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, val TEXT)")
+            _cache_conn = conn
+        except sqlite3.Error as e:
+            print("DeepL cache disabled:", e)
+            _cache_disabled = True
+            if conn is not None:
+                conn.close()
+    return _cache_conn
+
+
+def _disable_cache_db(e: sqlite3.Error):
+    """조회/저장 중 sqlite 오류(잠김/읽기 전용/디스크 부족 등) → 이후로는 메모리 캐시만 사용."""
+    global _cache_conn, _cache_disabled
+    print("DeepL cache disabled:", e)
+    _cache_disabled = True
+    if _cache_conn is not None:
+        try:
+            _cache_conn.close()
+        except sqlite3.Error:
+            pass
+        _cache_conn = None
+
+
+def _cache_get(key: str) -> str | None:
+    cached = _TRANSLATION_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    db = _cache_db()
+    if db is None:
+        return None
+    try:
+        row = db.execute("SELECT val FROM cache WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error as e:
+        _disable_cache_db(e)
+        return None
+    if row is None:
+        return None
+    _TRANSLATION_CACHE[key] = row[0]
+    return row[0]
+
+
+def _cache_put(key: str, val: str):
+    _TRANSLATION_CACHE[key] = val
+    db = _cache_db()
+    if db is None:
+        return
+    try:
+        db.execute("INSERT OR REPLACE INTO cache (key, val) VALUES (?, ?)", (key, val))
+    except sqlite3.Error as e:
+        _disable_cache_db(e)
+
+
+def _cache_commit():
+    if _cache_conn is None:
+        return
+    try:
+        _cache_conn.commit()
+    except sqlite3.Error as e:
+        _disable_cache_db(e)
+
+
+# DeepL은 요청 하나에 텍스트 배열(최대 50개, 128KiB)을 받음 → 여유 있게 100KiB로 제한
+DEEPL_BATCH_MAX_ITEMS = 50
+DEEPL_BATCH_MAX_BYTES = 100 * 1024
+
+
+def _pack_batches(
+    texts,
+    max_items: int = DEEPL_BATCH_MAX_ITEMS,
+    max_bytes: int = DEEPL_BATCH_MAX_BYTES,
+):
+    """texts를 (개수, 바이트) 한도 안에서 순서대로 묶은 인덱스 리스트들을 반환."""
+    batches, cur, cur_bytes = [], [], 0
+
+    for i, t in enumerate(texts):
+        size = len(t.encode("utf-8"))
+        if cur and (len(cur) >= max_items or cur_bytes + size > max_bytes):
+            batches.append(cur)
+            cur, cur_bytes = [], 0
+        cur.append(i)
+        cur_bytes += size
+
+    if cur:
+        batches.append(cur)
+
+    return batches
+
+
+# 재시도해도 소용없는 오류(키/쿼터) → 남은 배치는 보내지 않고 원문 유지
+_DEEPL_FATAL_ERRORS = (deepl.AuthorizationException, deepl.QuotaExceededException)
+
+
+def _is_transient_deepl_error(e: Exception) -> bool:
+    """429/연결 오류/5xx만 재시도 대상."""
+    if isinstance(e, (deepl.TooManyRequestsException, deepl.ConnectionException)):
+        return True
+    status = getattr(e, "http_status_code", None)
+    return isinstance(e, deepl.DeepLException) and (
+        e.should_retry or (status is not None and status >= 500)
+    )
+
+
+def _translate_batch_with_retry(sources, retries: int = 3, stop=None):
+    """
+    DeepL 배열 요청 1회(+재시도).
+    일시 오류는 지터 섞인 지수 백오프로 재시도, 끝내 실패하면 None.
+    키/쿼터 오류면 stop을 세워서 아직 안 보낸 배치도 건너뛰게 함.
+    """
+    for r in range(retries):
+        if stop is not None and stop.is_set():
+            return None
+        try:
+            return translator.translate_text(
+                sources,
+                target_lang=DEEPL_TARGET_LANG,
+                preserve_formatting=True,
+            )
+        except _DEEPL_FATAL_ERRORS as e:
+            print("DeepL translation stopped:", e)
+            if stop is not None:
+                stop.set()
+            return None
+        except Exception as e:
+            print("DEEPL ERROR:", e)
+            if not _is_transient_deepl_error(e) or r == retries - 1:
+                break
+            time.sleep(min(30.0, random.uniform(0.5, 1.5) * 2**r))
+    return None
+
+
+def translate_texts_batch(texts, retries: int = 3):
+    """
+    여러 텍스트를 DeepL 배열 요청으로 묶어서 번역(노드마다 HTTP 왕복 X).
+    입력 순서대로 결과를 반환하고, 실패한 배치는 원문을 그대로 둔다.
+    """
     if translator is None:
         raise ValueError("DEEPL_API_KEY가 설정되지 않았습니다.")
 
-    protected, mapping = protect_terms(text)
+    out = list(texts)
 
-    chunks = _split_by_paragraph(protected, max_chars=4500)
-    if not chunks:
-        return text
+    # 캐시 적중은 바로 채우고, 미스는 같은 문자열끼리 묶어서 한 번만 요청
+    misses = {}
+    for i, t in enumerate(texts):
+        key = _cache_key(t)
+        cached = _cache_get(key)
+        if cached is not None:
+            out[i] = cached
+        else:
+            misses.setdefault(key, []).append(i)
 
-    out_parts = []
-    for ch in chunks:
-        translated = None
-        for i in range(retries):
-            try:
-                result = translator.translate_text(
-                    ch,
-                    target_lang="KO",
-                    preserve_formatting=True,
-                )
-                translated = result.text
-                break
-            except Exception as e:
-                print("DEEPL ERROR:", e)
-                time.sleep(2 * (i + 1))
-        out_parts.append(translated if translated is not None else ch)
+    if not misses:
+        return out
+
+    keys = list(misses)
+    protected = [protect_terms(texts[misses[k][0]]) for k in keys]
+
+    batches = _pack_batches([p for p, _ in protected])
+
+    # 배치들을 동시에 보내고, 결과는 배치 순서대로 반영
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=min(DEEPL_MAX_WORKERS, len(batches))) as pool:
+        futures = [
+            pool.submit(_translate_batch_with_retry, [protected[j][0] for j in batch], retries, stop)
+            for batch in batches
+        ]
+
+    # 뒤쪽 배치에서 예외가 나도 앞에서 이미 받은(과금된) 번역은 디스크에 남김
+    try:
+        for batch, future in zip(batches, futures):
+            results = future.result()
+            if results is None:
+                continue
 
-    joined = "\n\n".join(out_parts)
-    return restore_terms(joined, mapping)
+            for j, result in zip(batch, results):
+                translated = restore_terms(result.text, protected[j][1])
+                _cache_put(keys[j], translated)
+                for i in misses[keys[j]]:
+                    out[i] = translated
+    finally:
+        _cache_commit()
+
+    if stop.is_set():
+        print(f"DeepL: {sum(f.result() is None for f in futures)}/{len(batches)} batches left untranslated")
+
+    return out
 
 
 # ======================
@@ -184,20 +365,95 @@ PARTNER_KEYWORDS = [
 ]
 
 
-def _text_has_any(text: str, keywords):
-    t = (text or "").lower()
-    return any(k.lower() in t for k in keywords)
+def _compile_keywords(keywords) -> re.Pattern:
+    """키워드 리스트를 대소문자 무시 alternation 정규식 하나로(노드마다 키워드 루프 X)."""
+    return re.compile("|".join(re.escape(k) for k in keywords), re.IGNORECASE)
+
+
+_HEADER_FOOTER_RE = _compile_keywords(REMOVE_KEYWORDS_HEADER_FOOTER)
+_REMOVE_SECTION_RE = _compile_keywords(REMOVE_SECTION_KEYWORDS)
+_PARTNER_RE = _compile_keywords(PARTNER_KEYWORDS)
+
+
+def _match_keyword_count(text: str, keywords_re: re.Pattern, limit: int | None = None) -> int:
+    """
+    포함된 '서로 다른' 키워드 개수(같은 키워드 반복은 1개로).
+    limit을 주면 그 개수에 도달하는 즉시 멈춤(호출 측이 '0 / limit 이상'만 볼 때).
+    """
+    found = set()
+    for m in keywords_re.finditer(text or ""):
+        found.add(m.group(0).lower())
+        if limit is not None and len(found) >= limit:
+            break
+    return len(found)
+
+
+# get_text 캐시용 세대 번호: 트리를 바꿀 때마다 올려서 이전에 캐시된 텍스트는 무효 처리
+_tree_generation = 0
+
+
+def _bump_tree_generation():
+    global _tree_generation
+    _tree_generation += 1
+
+
+def _decompose(el):
+    _bump_tree_generation()
+    el.decompose()
+
+
+def _extract(el):
+    _bump_tree_generation()
+    el.extract()
+
+
+def _get_text_cached(tag: Tag) -> str:
+    """
+    tag.get_text(" ", strip=True)를 태그에 붙여서 캐시.
+    같은 컨테이너/테이블을 여러 휴리스틱이 반복 검사할 때 서브트리 재순회를 피함.
+    """
+    cached = tag.__dict__.get("_cached_text_ws")
+    if cached is not None and cached[0] == _tree_generation:
+        return cached[1]
+    text = tag.get_text(" ", strip=True)
+    tag.__dict__["_cached_text_ws"] = (_tree_generation, text)
+    return text
+
+
+def _text_longer_than(tag: Tag, limit: int) -> bool:
+    """
+    len(tag.get_text(" ", strip=True)) > limit 인지를 문자열을 만들지 않고 판단.
+    한도를 넘는 순간 순회를 멈춤(큰 바깥 컨테이너는 앞부분만 보고 끝남).
+    """
+    cached = tag.__dict__.get("_cached_text_ws")
+    if cached is not None and cached[0] == _tree_generation:
+        return len(cached[1]) > limit
+
+    total = -1  # 구분자 " "는 (문자열 수 - 1)개
+    for s in tag.stripped_strings:
+        total += len(s) + 1
+        if total > limit:
+            return True
+    return max(total, 0) > limit
+
+
+def _iter_text_nodes(soup: BeautifulSoup):
+    """soup 전체 텍스트 노드(NavigableString)를 한 번의 트리 순회로 yield."""
+    for node in soup.descendants:
+        if isinstance(node, NavigableString):
+            yield node
+
 
+def _replace_text_node(node: NavigableString, text: str):
+    _bump_tree_generation()
+    node.replace_with(text)
 
-def _match_keyword_count(text: str, keywords) -> int:
-    t = (text or "").lower()
-    return sum(1 for k in keywords if k.lower() in t)
 
+def _rebrand(text: str) -> str:
+    return text.replace(BRAND_FROM, BRAND_TO) if BRAND_FROM in text else text
 
-def _replace_brand_everywhere(soup: BeautifulSoup, old: str, new: str):
-    for t in soup.find_all(string=True):
-        if old in t:
-            t.replace_with(t.replace(old, new))
+
+_HEADER_FOOTER_TAGS = ("header", "footer", "div", "section", "table", "tr", "td")
 
 
 def _remove_techpresso_header_footer_safely(soup: BeautifulSoup):
@@ -205,50 +461,65 @@ def _remove_techpresso_header_footer_safely(soup: BeautifulSoup):
     너무 큰 컨테이너를 날려서 본문이 사라지는 걸 줄이기 위해
     '짧은 블록' 위주로만 제거.
     """
-    candidates = soup.find_all(["header", "footer", "div", "section", "table", "tr", "td"])
-    for tag in candidates:
-        text = tag.get_text(" ", strip=True)
-        if not text:
+    # 키워드가 인라인 태그로 쪼개진 경우(<a>Read</a> <a>Online</a>)도 잡아야 하므로
+    # 후보는 블록 태그 전체, 대신 크기 게이트로 큰 블록은 텍스트를 만들기 전에 걸러냄
+    # 각 블록 텍스트는 문서 전체 텍스트의 부분 문자열 → 문서 전체에 키워드가 없으면 블록 루프 생략
+    if not _HEADER_FOOTER_RE.search(_get_text_cached(soup)):
+        return
+
+    for tag in soup.find_all(_HEADER_FOOTER_TAGS):
+        if tag.decomposed:
             continue
 
-        kw = _match_keyword_count(text, REMOVE_KEYWORDS_HEADER_FOOTER)
-        if kw == 0:
+        # 너무 큰 블록은 텍스트를 만들기 전에 걸러냄
+        if _text_longer_than(tag, 1600):
             continue
 
-        if len(text) > 1600:
+        text = _get_text_cached(tag)
+        if not text:
+            continue
+
+        # 0개 / 2개 이상만 구분하면 되므로 2개 찾으면 스캔 중단
+        kw = _match_keyword_count(text, _HEADER_FOOTER_RE, limit=2)
+        if kw == 0:
             continue
 
         if tag.name in ["div", "section", "table", "tr", "td"]:
             if kw >= 2:
-                tag.decompose()
+                _decompose(tag)
         else:
-            tag.decompose()
+            _decompose(tag)
 
 
 # ----------------------
 # ✅ 기사(이슈) 판별/이모지
 # ----------------------
+# 그림 이모지(1F300~1FAFF)만 '기사' 신호로 사용.
+# ✅ ✔ ➡ ✨ ★ 같은 기호/딩뱃(2600~27BF)은 광고 문구에도 흔해서 넣으면 광고 블록이 기사로 보호됨
 _EMOJI_RE = re.compile(r"[\U0001F300-\U0001FAFF]")
 
 
+def _has_emoji(text: str) -> bool:
+    # 대부분의 텍스트 노드는 ASCII → 정규식 엔진까지 가지 않고 바로 False
+    return bool(text) and not text.isascii() and _EMOJI_RE.search(text) is not None
+
+
 def _table_looks_like_issue(table: Tag) -> bool:
     """
     '기사 테이블' 판별 휴리스틱:
     - 테이블 텍스트에 이모지가 있으면 거의 확정(OneSip 본문 특성)
     - 아니면 padding-top: 50px 같은 기사 블록 스타일이 있으면 긍정
+    (싼 style 검사를 먼저 하고, 텍스트는 캐시된 get_text 재사용)
     """
-    try:
-        txt = table.get_text(" ", strip=True)
-    except Exception:
-        txt = ""
-    if txt and _EMOJI_RE.search(txt):
-        return True
-
     style = (table.get("style", "") or "").lower()
     if "padding-top" in style and "50" in style:
         return True
 
-    return False
+    try:
+        txt = _get_text_cached(table)
+    except Exception:
+        txt = ""
+    return _has_emoji(txt)
 
 
 def _container_has_issue_tables(tag: Tag) -> bool:
@@ -269,8 +540,8 @@ def _container_has_issue_content(tag: Tag) -> bool:
     - 기사 테이블로 보이는 table이 있으면 True
     """
     try:
-        txt = tag.get_text(" ", strip=True)
-        if txt and _EMOJI_RE.search(txt):
+        txt = _get_text_cached(tag)
+        if _has_emoji(txt):
             return True
     except Exception:
         pass
@@ -285,75 +556,62 @@ def _container_has_issue_content(tag: Tag) -> bool:
     return False
 
 
-def _remove_blocks_containing_keywords_safely(soup: BeautifulSoup, keywords) -> int:
+def _remove_blocks_containing_keywords_safely(soup: BeautifulSoup, keywords_re: re.Pattern) -> int:
     """
     keyword가 포함된 블록 삭제(안전 강화 버전)
     ✅ 단, '기사 컨텐츠(이모지/기사 테이블)'가 포함된 큰 컨테이너는 절대 삭제하지 않음
     """
     removed = 0
 
-    for node in list(soup.find_all(string=True)):
-        if not isinstance(node, NavigableString):
-            continue
-
-        s = str(node)
-        if not _text_has_any(s, keywords):
-            continue
-
-        # 가장 안전한 컨테이너를 위로 탐색
-        cur = node.parent
-        container = None
-
-        # 1) div/section 우선
-        while cur is not None:
-            if getattr(cur, "name", None) in ("div", "section"):
-                container = cur
+    # 키워드가 든 텍스트 노드만 미리 뽑아 둠(전체 노드를 돌며 하나씩 검사 X)
+    for node in soup.find_all(string=keywords_re):
+        # 가장 안전한 컨테이너를 위로 탐색: 조상 체인을 한 번만 올라가며
+        # 가장 가까운 div/section 과 table 을 같이 찾아 둠
+        container = table = None
+        for anc in node.parents:
+            if container is None and anc.name in ("div", "section"):
+                container = anc
+            elif table is None and anc.name == "table":
+                table = anc
+            if container is not None and table is not None:
                 break
-            cur = cur.parent
 
+        # 1) div/section 우선
         if container:
             # ✅ 기사 내용이 섞여 있으면 삭제 금지
             if _container_has_issue_content(container):
                 continue
 
-            txt = container.get_text(" ", strip=True)
+            txt = _get_text_cached(container)
             # 너무 큰 블록은 위험 -> 삭제 금지(기준 더 빡세게)
             if txt and len(txt) <= 2500:
-                container.decompose()
+                _decompose(container)
                 removed += 1
                 continue
 
         # 2) table(짧을 때만) — table 자체가 기사면 삭제 금지
-        cur = node.parent
-        table = None
-        while cur is not None:
-            if getattr(cur, "name", None) == "table":
-                table = cur
-                break
-            cur = cur.parent
-
         if table:
             if _table_looks_like_issue(table):
                 continue
 
-            txt = table.get_text(" ", strip=True)
+            txt = _get_text_cached(table)
             if txt and len(txt) <= 1800:
-                table.decompose()
+                _decompose(table)
                 removed += 1
                 continue
 
         # 3) fallback: p/h*/td 정도만 제거(기사 td면 삭제 금지)
         parent = node.parent
-        if parent and getattr(parent, "name", None) in ("p", "h1", "h2", "h3", "h4", "td"):
+        if parent is not None and parent.name in ("p", "h1", "h2", "h3", "h4", "td"):
             # td가 기사(이모지 포함)면 삭제 금지
             try:
-                ptxt = parent.get_text(" ", strip=True)
-                if ptxt and _EMOJI_RE.search(ptxt):
+                ptxt = _get_text_cached(parent)
+                if _has_emoji(ptxt):
                     continue
             except Exception:
                 pass
 
-            parent.decompose()
+            _decompose(parent)
             removed += 1
 
     return removed
@@ -370,28 +628,26 @@ def _remove_ai_academy_block_by_link(soup: BeautifulSoup) -> int:
     - 기사 보호는 '기사 테이블 존재 여부'로만 판단 (🎓 이모지로 기사 오판 방지)
     """
     removed = 0
-    anchors = soup.find_all("a", href=True)
 
-    for a in anchors:
-        href = a.get("href", "") or ""
-        if "academy.techpresso.co" not in href:
+    for a in soup.select("a[href*='academy.techpresso.co']"):
+        if a.decomposed:
             continue
 
         tr = a.find_parent("tr")
         if isinstance(tr, Tag) and not _container_has_issue_tables(tr):
-            tr.decompose()
+            _decompose(tr)
             removed += 1
             continue
 
         table = a.find_parent("table")
         if isinstance(table, Tag) and not _container_has_issue_tables(table):
-            table.decompose()
+            _decompose(table)
             removed += 1
             continue
 
         parent = a.find_parent(["div", "section", "td", "p"])
         if isinstance(parent, Tag) and not _container_has_issue_tables(parent):
-            parent.decompose()
+            _decompose(parent)
             removed += 1
 
     return removed
@@ -410,9 +666,7 @@ def _find_partner_marker_tag(soup: BeautifulSoup) -> Tag | None:
     if isinstance(tag, Tag):
         return tag
 
-    for n in soup.find_all(string=True):
-        if not isinstance(n, NavigableString):
-            continue
+    for n in _iter_text_nodes(soup):
         if "from our partner" in str(n).lower():
             h = n.find_parent(["h1", "h2", "h3", "h4", "h5", "h6"])
             if h:
@@ -427,7 +681,10 @@ def _find_partner_marker_tag(soup: BeautifulSoup) -> Tag | None:
 
 def _find_first_issue_table_after(marker_tag: Tag) -> Tag | None:
     first_table = None
-    for t in marker_tag.find_all_next("table"):
+    # find_all_next는 뒤쪽 table 전부를 리스트로 만들기 때문에 next_elements로 지연 탐색
+    for t in marker_tag.next_elements:
+        if not isinstance(t, Tag) or t.name != "table":
+            continue
         if first_table is None:
             first_table = t
         if _table_looks_like_issue(t):
@@ -452,36 +709,42 @@ def _remove_first_partner_block_until_first_issue_table(soup: BeautifulSoup) ->
         return 0
 
     # 1) issue_table 기준으로 위로 올라가며 marker를 포함하는 "공통 부모" 찾기
-    common_parent = issue_table
-    while common_parent is not None:
-        try:
-            if marker in common_parent.descendants:
-                break
-        except Exception:
-            pass
-        common_parent = common_parent.parent
+    #    (marker 조상 체인을 한 번 만들어 두고 id로 비교 → 매번 descendants 전체 순회 X, O(depth))
+    #    조상 바로 아래 자식(체인에서 한 칸 아래)도 같이 기억해 두면 2)·3)을 다시 올라갈 필요 없음
+    marker_child_under = {}
+    child = marker
+    for p in marker.parents:
+        marker_child_under[id(p)] = child
+        child = p
+
+    common_parent = None
+    start_child = end_child = None
+    child = issue_table
+    for anc in issue_table.parents:
+        if id(anc) in marker_child_under:
+            common_parent = anc
+            # 2) common_parent 바로 아래 레벨에서 marker를 포함하는 direct child(start_child)
+            start_child = marker_child_under[id(anc)]
+            # 3) common_parent 바로 아래 레벨에서 issue_table을 포함하는 direct child(end_child)
+            end_child = child
+            break
+        child = anc
 
     if common_parent is None:
         return 0
 
-    # 2) common_parent 바로 아래 레벨에서 marker를 포함하는 direct child(start_child) 찾기
-    start_child = marker
-    while start_child.parent is not None and start_child.parent != common_parent:
-        start_child = start_child.parent
-
-    # 3) common_parent 바로 아래 레벨에서 issue_table을 포함하는 direct child(end_child) 찾기
-    end_child = issue_table
-    while end_child.parent is not None and end_child.parent != common_parent:
-        end_child = end_child.parent
-
     # 4) common_parent.contents에서 start_child ~ end_child 직전까지 삭제
+    #    (Tag.__eq__는 구조 비교라서 list.index 대신 identity로 위치 찾기)
     removed = 0
     siblings = list(common_parent.contents)
 
-    try:
-        i = siblings.index(start_child)
-        j = siblings.index(end_child)
-    except ValueError:
+    i = j = None
+    for k, node in enumerate(siblings):
+        if node is start_child:
+            i = k
+        if node is end_child:
+            j = k
+    if i is None or j is None:
         return 0
 
     if i >= j:
@@ -490,17 +753,17 @@ def _remove_first_partner_block_until_first_issue_table(soup: BeautifulSoup) ->
     for node in siblings[i:j]:
         if isinstance(node, NavigableString):
             if str(node).strip() == "":
-                node.extract()
+                _extract(node)
             else:
-                node.extract()
+                _extract(node)
                 removed += 1
             continue
 
         try:
-            node.decompose()
+            _decompose(node)
         except Exception:
             try:
-                node.extract()
+                _extract(node)
             except Exception:
                 pass
         removed += 1
@@ -519,22 +782,15 @@ def _remove_spotlight_partner_block(soup: BeautifulSoup) -> int:
     """
     removed = 0
 
-    block = soup.find(id="spotlight-ad-block")
-    if isinstance(block, Tag):
-        tr = block.find_parent("tr")
-        if isinstance(tr, Tag):
-            tr.decompose()
-        else:
-            block.decompose()
-        removed += 1
-
-    title = soup.find(id="spotlight-ad-title")
-    if isinstance(title, Tag):
-        tr = title.find_parent("tr")
+    # block/title을 한 번의 select로 찾고, 앞에서 같이 지워진 건 건너뜀
+    for hook in soup.select("#spotlight-ad-block, #spotlight-ad-title"):
+        if hook.decomposed:
+            continue
+        tr = hook.find_parent("tr")
         if isinstance(tr, Tag):
-            tr.decompose()
+            _decompose(tr)
         else:
-            title.decompose()
+            _decompose(hook)
         removed += 1
 
     return removed
@@ -544,9 +800,7 @@ def _remove_spotlight_partner_block(soup: BeautifulSoup) -> int:
 # ✅ Partner 블록 제거 (3) 미래 대비: FROM OUR PARTNER가 3번 이상 생겨도 반복 제거
 # ----------------------
 def _find_next_partner_text_node(soup: BeautifulSoup) -> NavigableString | None:
-    for n in soup.find_all(string=True):
-        if not isinstance(n, NavigableString):
-            continue
+    for n in _iter_text_nodes(soup):
         if "from our partner" in str(n).lower():
             return n
     return None
@@ -567,35 +821,35 @@ def _remove_partner_block_around_text_node(n: NavigableString) -> bool:
     tr = n.find_parent("tr")
     if isinstance(tr, Tag):
         if not _container_has_issue_content(tr):
-            tr.decompose()
+            _decompose(tr)
             return True
 
     # 2) table
     table = n.find_parent("table")
     if isinstance(table, Tag):
         if not _table_looks_like_issue(table) and not _container_has_issue_content(table):
-            table.decompose()
+            _decompose(table)
             return True
 
     # 3) div/section
     container = n.find_parent(["div", "section"])
     if isinstance(container, Tag):
         if not _container_has_issue_content(container):
-            txt = container.get_text(" ", strip=True)
+            txt = _get_text_cached(container)
             if txt and len(txt) <= 3000:
-                container.decompose()
+                _decompose(container)
                 return True
 
     # 4) fallback: h태그/td/p 정도만
     parent = n.find_parent(["h1", "h2", "h3", "h4", "p", "td"])
     if isinstance(parent, Tag):
         try:
-            ptxt = parent.get_text(" ", strip=True)
-            if ptxt and _EMOJI_RE.search(ptxt):
+            ptxt = _get_text_cached(parent)
+            if _has_emoji(ptxt):
                 return False
         except Exception:
             pass
-        parent.decompose()
+        _decompose(parent)
         return True
 
     return False
@@ -611,7 +865,7 @@ def _remove_partner_blocks_until_limit(soup: BeautifulSoup, max_blocks: int = 5)
             removed += 1
             continue
         try:
-            n.extract()
+            _extract(n)
         except Exception:
             pass
         break
@@ -622,12 +876,8 @@ def _remove_partner_blocks_until_limit(soup: BeautifulSoup, max_blocks: int = 5)
 # 첫 기사 정렬 보정
 # ----------------------
 def _find_first_emoji_string(soup: BeautifulSoup):
-    for node in soup.find_all(string=True):
-        if not isinstance(node, NavigableString):
-            continue
-        if _EMOJI_RE.search(str(node)):
-            return node
-    return None
+    # find는 첫 일치에서 바로 멈춤 (ASCII 노드는 _has_emoji의 isascii로 즉시 통과)
+    return soup.find(string=_has_emoji)
 
 
 def _ensure_first_issue_left_align(soup: BeautifulSoup):
@@ -656,74 +906,109 @@ def _ensure_first_issue_left_align(soup: BeautifulSoup):
 # ----------------------
 URL_RE = re.compile(r"(https?://\S+|www\.\S+)", re.IGNORECASE)
 
+# URL 제거 후 남는 빈 괄호 / 연속 공백 정리용 (모듈 로드 때 한 번만 컴파일)
+_EMPTY_PAREN_RE = re.compile(r"\(\s*\)")
+_MULTI_WS_RE = re.compile(r"\s{2,}")
+
 
-def remove_visible_urls(soup: BeautifulSoup):
+def _strip_visible_urls(text: str) -> str:
     """
     '텍스트로 노출된 URL'만 제거해서 PDF에 URL이 보이지 않게.
     <a href="...">는 건드리지 않아서 링크는 유지됨.
     """
-    for node in list(soup.find_all(string=True)):
-        if not isinstance(node, NavigableString):
-            continue
+    if not URL_RE.search(text):
+        return text
+    cleaned = URL_RE.sub("", text)
+    cleaned = _EMPTY_PAREN_RE.sub("", cleaned)  # 빈 괄호 제거
+    return _MULTI_WS_RE.sub(" ", cleaned).strip()
 
-        parent = node.parent.name if node.parent else ""
-        if parent in ("script", "style"):
-            continue
 
-        txt = str(node)
-        if not txt.strip():
-            continue
+# 영문자 2개 이상 포함 여부 (findall처럼 글자 리스트를 만들지 않음)
+_TWO_LETTERS_RE = re.compile(r"[A-Za-z][^A-Za-z]*[A-Za-z]")
+
+# 단독으로 나오면 번역해도 그대로인 약어들 → DeepL 호출 생략
+_NO_TRANSLATE_SHORT = {"ai", "ml", "gpt", "llm", "api", "sdk"}
+
+
+def _translation_source(parent: str, text: str) -> str | None:
+    """번역 대상이면 DeepL에 보낼 문자열, 아니면 None."""
+    # ✅ Trending tools 등에서 bold/strong(도구명/고유명사)은 번역 제외
+    if parent in ("strong", "b"):
+        return None
+
+    if not text or text.isspace():
+        return None
 
-        if URL_RE.search(txt):
-            cleaned = URL_RE.sub("", txt)
-            cleaned = re.sub(r"\(\s*\)", "", cleaned)  # 빈 괄호 제거
-            cleaned = re.sub(r"\s{2,}", " ", cleaned).strip()
-            node.replace_with(cleaned)
+    # URL이 텍스트로 들어있다면(혹시 남았으면) 번역 전에 제거 (없으면 sub 한 번으로 끝)
+    text = URL_RE.sub("", text)
 
+    # 영어 알파벳이 거의 없으면 스킵 (두 번째 글자를 찾는 즉시 멈춤)
+    if not _TWO_LETTERS_RE.search(text):
+        return None
 
-def translate_text_nodes_inplace(soup: BeautifulSoup):
+    if text.strip().lower() in _NO_TRANSLATE_SHORT:
+        return None
+
+    # 보호 단어(OneSip 등)를 빼면 영문이 안 남는 노드는 placeholder만 왕복하므로 스킵
+    if PROTECT_TERMS and not _TWO_LETTERS_RE.search(_PROTECT_RE.sub(" ", text)):
+        return None
+
+    # 너무 긴 노드는 위험/비용 큼 → 스킵
+    if len(text) > 2000:
+        return None
+
+    return text.strip()
+
+
+def rewrite_text_nodes_inplace(soup: BeautifulSoup):
     """
-    HTML 태그 구조는 그대로 유지하고, 텍스트 노드만 번역.
+    HTML 태그 구조는 그대로 유지하고 텍스트 노드만 한 번 순회하면서
+    브랜딩 치환(Techpresso -> OneSip) → URL 텍스트 제거 → 번역 대상 수집을 같이 처리.
+    수집된 노드는 DeepL 배치 번역 결과로 교체.
     => <a href> 링크 유지 + URL은 번역/표시하지 않음
     """
-    translated_nodes = 0
+    # 순회 중에는 트리를 건드리지 않고 바꿀 노드만 모아 뒀다가 끝나고 반영
+    # (전체 텍스트 노드 목록을 미리 떠 둘 필요 없음)
+    changed, pending = [], []
+
+    for node in _iter_text_nodes(soup):
+        # descendants로 나온 노드는 항상 부모가 있음
+        parent = node.parent.name
+        original = str(node)
+        text = _rebrand(original)
+
+        if parent not in ("script", "style"):
+            text = _strip_visible_urls(text)
+            source = _translation_source(parent, text)
+            if source is not None:
+                # 번역 결과로 한 번에 교체(그 전에 중간 결과로 바꿔 둘 필요 없음)
+                pending.append((node, source))
+                continue
 
-    for node in list(soup.find_all(string=True)):
-        if not isinstance(node, NavigableString):
-            continue
+        if text != original:
+            changed.append((node, text))
 
-        parent = node.parent.name if node.parent else ""
-        if parent in ("script", "style"):
-            continue
+    for node, text in changed:
+        _replace_text_node(node, text)
 
-        # ✅ Trending tools 등에서 bold/strong(도구명/고유명사)은 번역 제외
-        if parent in ("strong", "b"):
-            continue
+    if not pending:
+        print("Translated text nodes:", 0)
+        return
 
-        text = str(node)
-        if not text.strip():
-            continue
+    translated = translate_texts_batch([src for _, src in pending])
+    for (node, _), tr_text in zip(pending, translated):
+        _replace_text_node(node, tr_text)
 
-        # URL이 텍스트로 들어있다면(혹시 남았으면) 번역 전에 제거
-        if URL_RE.search(text):
-            text = URL_RE.sub("", text)
+    print("Translated text nodes:", len(pending))
 
-        # 영어 알파벳이 거의 없으면 스킵
-        if len(re.findall(r"[A-Za-z]", text)) < 2:
-            continue
 
-        # 너무 긴 노드는 위험/비용 큼 → 스킵
-        if len(text) > 2000:
-            continue
-
-        translated = translate_text(text)
-        if translated is None:
-            continue
+AD_SELECTOR = "[data-testid='ad'], .sponsor, .advertisement"
 
-        node.replace_with(translated)
-        translated_nodes += 1
 
-    print("Translated text nodes:", translated_nodes)
+def _remove_ads_by_selector(soup: BeautifulSoup) -> None:
+    for ad in soup.select(AD_SELECTOR):
+        if not ad.decomposed:
+            _decompose(ad)
 
 
 def _remove_partner_everything(soup: BeautifulSoup) -> None:
@@ -747,8 +1032,12 @@ def _remove_partner_everything(soup: BeautifulSoup) -> None:
         print("Extra partner blocks removed:", removed_rest)
 
 
-def translate_html_preserve_layout(html: str, date_str: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
+def translate_html_preserve_layout(html: str, date_str: str) -> tuple[str, int]:
+    """
+    정리/번역된 본문 HTML과 그 텍스트 길이를 함께 반환.
+    (길이는 이미 들고 있는 soup에서 재므로 호출 측에서 다시 파싱할 필요 없음)
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
 
     # 0) 헤더/푸터 제거
     _remove_techpresso_header_footer_safely(soup)
@@ -756,10 +1045,9 @@ def translate_html_preserve_layout(html: str, date_str: str) -> str:
     # ✅ Partner 전체 제거(1~N)
     _remove_partner_everything(soup)
 
-    print(
-        "After partner removal text length:",
-        len(BeautifulSoup(str(soup), "html.parser").get_text(" ", strip=True)),
-    )
+    # ✅ DEBUG: 중간 길이 로그는 전체 트리를 한 번 더 훑으므로 디버그 때만
+    if DEBUG_DUMP_HTML:
+        print("After partner removal text length:", len(soup.get_text(" ", strip=True)))
 
     # ✅ AI Academy(🎓) 링크 기반 제거 (가장 정확하고 안전)
     removed_academy = _remove_ai_academy_block_by_link(soup)
@@ -767,44 +1055,34 @@ def translate_html_preserve_layout(html: str, date_str: str) -> str:
         print("AI Academy block removed by link:", removed_academy)
 
     # 1) 파트너 키워드 잔여 처리(아주 보수적으로)
-    removed_partner2 = _remove_blocks_containing_keywords_safely(soup, PARTNER_KEYWORDS)
+    removed_partner2 = _remove_blocks_containing_keywords_safely(soup, _PARTNER_RE)
     if removed_partner2:
         print("Blocks removed by keywords (partner):", removed_partner2)
 
     # 2) AI Academy 섹션 삭제(키워드 기반 보조)
-    removed_ai = _remove_blocks_containing_keywords_safely(soup, REMOVE_SECTION_KEYWORDS)
+    removed_ai = _remove_blocks_containing_keywords_safely(soup, _REMOVE_SECTION_RE)
     if removed_ai:
         print("Blocks removed by keywords (ai-academy):", removed_ai)
 
     # ✅ DEBUG: 키워드 제거 직후 본문 길이 확인
-    print(
-        "After keyword removals text length:",
-        len(BeautifulSoup(str(soup), "html.parser").get_text(" ", strip=True)),
-    )
+    if DEBUG_DUMP_HTML:
+        print("After keyword removals text length:", len(soup.get_text(" ", strip=True)))
 
     # 3) 기타 광고 제거(선택자 기반)
-    for ad in soup.select("[data-testid='ad'], .sponsor, .advertisement"):
-        ad.decompose()
-
-    # 4) 브랜딩 치환 (Techpresso -> OneSip)
-    _replace_brand_everywhere(soup, BRAND_FROM, BRAND_TO)
+    _remove_ads_by_selector(soup)
 
-    # 5) URL 텍스트 제거(링크는 유지)
-    remove_visible_urls(soup)
-
-    # 6) 텍스트 노드 번역 (bold/strong은 제외)
-    translate_text_nodes_inplace(soup)
+    # 4~6) 브랜딩 치환 + URL 텍스트 제거(링크는 유지) + 번역(bold/strong 제외)
+    #      → 텍스트 노드 한 번 순회로 처리
+    rewrite_text_nodes_inplace(soup)
 
     # 7) 첫 기사 left-align 보정(가운데 밀림 방지)
     _ensure_first_issue_left_align(soup)
 
-    out_html = str(soup)
-
     # fallback: 본문이 너무 짧으면 제거 없이 다시 번역(단, 파트너/아카데미 삭제는 유지)
-    text_len = len(BeautifulSoup(out_html, "html.parser").get_text(" ", strip=True))
+    text_len = len(soup.get_text(" ", strip=True))
     if text_len < 200:
         print("WARNING: HTML too small after cleanup. Falling back without header/footer removal.")
-        soup2 = BeautifulSoup(html, "html.parser")
+        soup2 = BeautifulSoup(html, HTML_PARSER)
 
         # ✅ fallback에서도 동일 적용
         _remove_partner_everything(soup2)
@@ -813,18 +1091,19 @@ def translate_html_preserve_layout(html: str, date_str: str) -> str:
         if removed_academy2:
             print("AI Academy block removed by link (fallback):", removed_academy2)
 
-        _remove_blocks_containing_keywords_safely(soup2, PARTNER_KEYWORDS)
-        _remove_blocks_containing_keywords_safely(soup2, REMOVE_SECTION_KEYWORDS)
+        _remove_blocks_containing_keywords_safely(soup2, _PARTNER_RE)
+        _remove_blocks_containing_keywords_safely(soup2, _REMOVE_SECTION_RE)
 
-        for ad in soup2.select("[data-testid='ad'], .sponsor, .advertisement"):
-            ad.decompose()
+        _remove_ads_by_selector(soup2)
 
-        _replace_brand_everywhere(soup2, BRAND_FROM, BRAND_TO)
-        remove_visible_urls(soup2)
-        translate_text_nodes_inplace(soup2)
+        rewrite_text_nodes_inplace(soup2)
         _ensure_first_issue_left_align(soup2)
 
-        out_html = str(soup2)
+        soup = soup2
+        text_len = len(soup.get_text(" ", strip=True))
+
+    # 직렬화는 최종 soup에 대해 한 번만
+    out_html = str(soup)
 
     if DEBUG_DUMP_HTML:
         with open(f"debug_onesip_inner_{date_str}.html", "w", encoding="utf-8") as f:
@@ -832,12 +1111,9 @@ def translate_html_preserve_layout(html: str, date_str: str) -> str:
         print("Wrote debug inner HTML:", f"debug_onesip_inner_{date_str}.html")
 
     # ✅ DEBUG: 최종 반환 직전 길이 확인
-    print(
-        "Before return text length:",
-        len(BeautifulSoup(out_html, "html.parser").get_text(" ", strip=True)),
-    )
+    print("Before return text length:", text_len)
 
-    return out_html
+    return out_html, text_len
 
 
 # ======================
@@ -896,69 +1172,152 @@ def wrap_html_for_pdf(inner_html: str) -> str:
 # ======================
 # RSS → 특정 날짜(오프셋) HTML 추출
 # ======================
+def _entry_published_kst_date(e):
+    published_utc = datetime(*e.published_parsed[:6], tzinfo=timezone.utc)
+    return published_utc.astimezone(KST).date()
+
+
+def _fetch_rss_bytes(url: str) -> bytes:
+    """
+    RSS 원문 다운로드. 지난 실행의 ETag/Last-Modified로 조건부 요청해서
+    304면 저장해 둔 원문을 그대로 사용. 실패하면 빈 bytes(→ 엔트리 없음).
+    """
+    meta_path = RSS_CACHE_PATH + ".json" if RSS_CACHE_PATH else ""
+    headers = {"User-Agent": feedparser.USER_AGENT}
+
+    meta = {}
+    if meta_path and os.path.exists(meta_path) and os.path.exists(RSS_CACHE_PATH):
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            # 잘리거나 깨진 저장본 → 조건부 요청 없이 그냥 다시 받음
+            print("RSS cache ignored:", e)
+            meta = {}
+        if isinstance(meta, dict) and meta.get("url") == url:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("modified"):
+                headers["If-Modified-Since"] = meta["modified"]
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as resp:
+            body = resp.read()
+            etag = resp.headers.get("ETag")
+            modified = resp.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and len(headers) > 1:
+            print("RSS not modified (304). Using cached feed:", RSS_CACHE_PATH)
+            with open(RSS_CACHE_PATH, "rb") as f:
+                return f.read()
+        print("RSS ERROR:", e)
+        return b""
+    except (urllib.error.URLError, OSError) as e:
+        print("RSS ERROR:", e)
+        return b""
+
+    if meta_path and (etag or modified):
+        # 저장 실패(폴더 없음/권한/디스크 부족)는 다음 실행이 조건부 요청을 못 할 뿐 → 받은 본문은 그대로 사용
+        try:
+            with open(RSS_CACHE_PATH, "wb") as f:
+                f.write(body)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "etag": etag, "modified": modified}, f)
+        except OSError as e:
+            print("RSS cache not saved:", e)
+            # 본문만 바뀌고 메타가 옛것으로 남아 304를 받는 일이 없도록 메타는 지움
+            try:
+                os.remove(meta_path)
+            except OSError:
+                pass
+
+    return body
+
+
 def fetch_issue_html_by_offset():
-    feed = feedparser.parse(RSS_URL)
+    # 조건부 요청은 http(s)만. 로컬 파일 경로 등은 예전처럼 feedparser가 직접 읽음
+    source = RSS_URL
+    if RSS_URL.startswith(("http://", "https://")):
+        source = _fetch_rss_bytes(RSS_URL)
+
+    # 상대URL 보정만 생략. sanitize는 유지:
+    # <style>/<script>/<iframe>, data-* 속성, 인라인 url(...) 등을 걸러서 렌더러에 안 넘김
+    feed = feedparser.parse(source, resolve_relative_uris=False)
 
     target_date = (now_kst().date() + timedelta(days=ISSUE_OFFSET_DAYS))
     print("Target issue date (KST):", target_date, "offset:", ISSUE_OFFSET_DAYS)
 
-    candidates = []
-    for e in feed.entries:
-        if not hasattr(e, "published_parsed"):
-            continue
-        if "content" not in e or not e.content:
-            continue
+    entries = [
+        e
+        for e in feed.entries
+        if hasattr(e, "published_parsed") and "content" in e and e.content
+    ]
+    if not entries:
+        return None, None
 
-        published_utc = datetime(*e.published_parsed[:6], tzinfo=timezone.utc)
-        published_kst_dt = published_utc.astimezone(KST)
-        published_kst_date = published_kst_dt.date()
+    # 최신순 정렬 → 처음 만나는 일치/이전 발행본이 곧 가장 최신(전체 후보 리스트 X)
+    entries.sort(key=lambda e: tuple(e.published_parsed[:6]), reverse=True)
 
-        candidates.append((published_kst_dt, published_kst_date, e.content[0].value))
+    for e in entries:
+        published_kst_date = _entry_published_kst_date(e)
 
-    if not candidates:
-        return None, None
+        # 1) 정확히 target_date와 일치하는 발행본 우선
+        if published_kst_date == target_date:
+            return e.content[0].value, target_date
 
-    # 1) 정확히 target_date와 일치하는 발행본 우선
-    exact = [c for c in candidates if c[1] == target_date]
-    if exact:
-        exact.sort(key=lambda x: x[0], reverse=True)
-        return exact[0][2], target_date
-
-    # 2) 없으면 target_date 이전(older) 중 가장 최신 fallback
-    older = [c for c in candidates if c[1] < target_date]
-    if older:
-        older.sort(key=lambda x: x[0], reverse=True)
-        chosen_dt, chosen_date, chosen_html = older[0]
-        print("No exact match. Fallback to older issue date (KST):", chosen_date)
-        return chosen_html, chosen_date
+        # 2) 없으면 target_date 이전(older) 중 가장 최신 fallback
+        if published_kst_date < target_date:
+            print("No exact match. Fallback to older issue date (KST):", published_kst_date)
+            return e.content[0].value, published_kst_date
 
     # 3) 그래도 없으면 그냥 가장 최신(안전망)
-    candidates.sort(key=lambda x: x[0], reverse=True)
-    chosen_dt, chosen_date, chosen_html = candidates[0]
-    print("No older match. Fallback to latest issue date (KST):", chosen_date)
-    return chosen_html, chosen_date
+    latest = entries[0]
+    latest_date = _entry_published_kst_date(latest)
+    print("No older match. Fallback to latest issue date (KST):", latest_date)
+    return latest.content[0].value, latest_date
 
 
 # ======================
 # PDF 생성
 # ======================
+# 폰트 탐색 결과(Noto CJK 등)는 프로세스 안에서 재사용
+_FONT_CONFIG = FontConfiguration()
+
+
 def html_to_pdf(inner_html: str, date_str: str):
     filename = f"HCS - OneSip_{date_str}.pdf"
     final_html = wrap_html_for_pdf(inner_html)
 
+    # 큰 HTML 문자열을 그대로 넘기지 않고 파일로 써서 WeasyPrint가 파일에서 읽게 함
     if DEBUG_DUMP_HTML:
-        with open(f"debug_onesip_pdf_{date_str}.html", "w", encoding="utf-8") as f:
+        src_path = f"debug_onesip_pdf_{date_str}.html"
+        with open(src_path, "w", encoding="utf-8") as f:
             f.write(final_html)
-        print("Wrote debug pdf HTML:", f"debug_onesip_pdf_{date_str}.html")
+        print("Wrote debug pdf HTML:", src_path)
+    else:
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".html", encoding="utf-8", delete=False
+        ) as tmp:
+            tmp.write(final_html)
+        src_path = tmp.name
+
+    try:
+        HTML(filename=src_path, encoding="utf-8").write_pdf(
+            filename,
+            font_config=_FONT_CONFIG,
+            optimize_images=True,
+        )
+    finally:
+        if not DEBUG_DUMP_HTML:
+            os.unlink(src_path)
 
-    HTML(string=final_html).write_pdf(filename)
     return filename
 
 
 # ======================
 # 이메일 발송
 # ======================
-def send_email(pdf_path: str, date_str: str):
+def _mail_settings():
     smtp_user = os.getenv("SMTP_USER")
     smtp_pass = os.getenv("SMTP_PASS")
     mail_from = os.getenv("MAIL_FROM")
@@ -977,6 +1336,40 @@ def send_email(pdf_path: str, date_str: str):
     if missing:
         raise ValueError(f"이메일 설정 환경변수가 비었습니다: {', '.join(missing)}")
 
+    return smtp_user, smtp_pass, mail_from, mail_to
+
+
+def open_smtp_connection() -> smtplib.SMTP_SSL:
+    """SMTP TLS 연결 + 로그인까지 끝낸 세션 반환(PDF 렌더링과 겹쳐서 미리 열어 둘 수 있음)."""
+    smtp_user, smtp_pass, _, _ = _mail_settings()
+
+    context = ssl.create_default_context()
+    server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=context)
+    try:
+        server.login(smtp_user, smtp_pass)
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+def _is_stale_smtp_error(e: Exception) -> bool:
+    """
+    미리 열어 둔 연결이 죽었을 때 나는 오류인지.
+    끊김, 421(서버가 유휴 세션을 닫음), 소켓/TLS 오류(ssl.SSLError 포함)만 해당.
+    수신자 거부/본문 거부 같은 다른 SMTP 응답 오류는 다시 보내도 똑같으므로 제외.
+    """
+    if isinstance(e, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(e, smtplib.SMTPResponseException):
+        return e.smtp_code == 421
+    # SMTPException도 OSError 하위 클래스라서 순수 소켓/TLS 오류만 남김
+    return isinstance(e, OSError) and not isinstance(e, smtplib.SMTPException)
+
+
+def send_email(pdf_path: str, date_str: str, server: smtplib.SMTP_SSL | None = None):
+    _, _, mail_from, mail_to = _mail_settings()
+
     msg = EmailMessage()
     msg["Subject"] = f"{MAIL_SUBJECT_PREFIX} ({date_str})"
     msg["From"] = mail_from
@@ -987,23 +1380,47 @@ def send_email(pdf_path: str, date_str: str):
         "가볍게 읽어보시고 하루를 시작해보세요 ☕️"
     )
 
-    with open(pdf_path, "rb") as f:
+    # PDF를 bytes로 통째 복사하지 않고 mmap 뷰를 그대로 base64 인코딩(C 경로)에 넘김
+    with (
+        open(pdf_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        memoryview(mm) as view,
+    ):
         msg.add_attachment(
-            f.read(),
+            view,
             maintype="application",
             subtype="pdf",
             filename=os.path.basename(pdf_path),
+            cte="base64",
         )
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, context=context) as server:
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
+    if server is None:
+        with open_smtp_connection() as fresh:
+            fresh.send_message(msg)
+        return
+
+    try:
+        with server:
+            server.send_message(msg)
+    except Exception as e:
+        if not _is_stale_smtp_error(e):
+            raise
+        # 미리 열어 둔 연결이 렌더링 동안 끊겼으면 새로 연결해서 한 번 더
+        print("SMTP reconnect:", e)
+        with open_smtp_connection() as fresh:
+            fresh.send_message(msg)
 
 
 # ======================
 # 메인
 # ======================
+def _discard_smtp_future(future):
+    try:
+        future.result().close()
+    except Exception:
+        pass
+
+
 def main():
     safe_print_deepl_usage("DeepL usage(before)")
 
@@ -1014,21 +1431,33 @@ def main():
 
     date_str = issue_date.strftime("%Y-%m-%d")
 
-    translated_inner_html = translate_html_preserve_layout(raw_html, date_str)
-
-    final_text_len = len(
-        BeautifulSoup(translated_inner_html, "html.parser").get_text(" ", strip=True)
-    )
+    translated_inner_html, final_text_len = translate_html_preserve_layout(raw_html, date_str)
     print("Final HTML text length:", final_text_len)
 
     if final_text_len < 200:
         raise RuntimeError("Final HTML seems empty. Aborting to avoid blank PDF.")
 
-    pdf_path = html_to_pdf(translated_inner_html, date_str)
+    # PDF 렌더링(CPU) 동안 SMTP TLS 연결/로그인을 백그라운드에서 미리 해 둠
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        smtp_future = pool.submit(open_smtp_connection)
+        try:
+            pdf_path = html_to_pdf(translated_inner_html, date_str)
+        except Exception:
+            _discard_smtp_future(smtp_future)
+            raise
 
     safe_print_deepl_usage("DeepL usage(after)")
 
-    send_email(pdf_path, date_str)
+    # 미리 연결이 네트워크/TLS 오류로 실패했으면 보낼 때 새로 연결(로그인 실패 등은 거기서 다시 드러남)
+    try:
+        server = smtp_future.result()
+    except Exception as e:
+        if not _is_stale_smtp_error(e):
+            raise
+        print("SMTP pre-connect failed:", e)
+        server = None
+
+    send_email(pdf_path, date_str, server=server)
     print("Done:", pdf_path)
 
 